@@ -1504,10 +1504,10 @@ class TestBeforeTradingStart(WithDataPortal,
             bts_portfolio = context.portfolio
             # Assert that the portfolio in BTS is the same as the last
             # portfolio in handle_data, except for the positions
-            for k in bts_portfolio.__dict__:
+            for k in bts_portfolio.__slots__:
                 if k != 'positions':
-                    assert (context.hd_portfolio.__dict__[k]
-                            == bts_portfolio.__dict__[k])
+                    assert (getattr(context.hd_portfolio, k)
+                            == getattr(bts_portfolio, k))
             record(pos_value=bts_portfolio.positions_value)
             record(pos_amount=bts_portfolio.positions[sid(3)].amount)
             record(
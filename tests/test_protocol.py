@@ -0,0 +1,314 @@
+#
+# Copyright 2017 Quantopian, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import pickle
+import warnings
+
+import pandas as pd
+from unittest import TestCase
+
+from zipline.assets import Equity, Future
+from zipline.finance.performance import PositionTracker
+from zipline.protocol import (
+    Account,
+    Order,
+    Portfolio,
+    Position,
+    Positions,
+    PositionTable,
+)
+from zipline.testing.predicates import assert_equal
+
+
+def make_position(asset, amount, last_sale_price):
+    position = Position(asset)
+    position.amount = amount
+    position.last_sale_price = last_sale_price
+    return position
+
+
+class PortfolioWeightsTestCase(TestCase):
+
+    def setUp(self):
+        self.portfolio = Portfolio()
+        self.portfolio.portfolio_value = 1000.0
+
+    def test_empty_portfolio(self):
+        assert_equal(
+            self.portfolio.current_portfolio_weights,
+            pd.Series([], index=[], dtype='float64'),
+        )
+
+    def test_weights(self):
+        equity = Equity(1, exchange='test')
+        short = Equity(2, exchange='test')
+        future = Future(3, exchange='test', multiplier=100.0)
+
+        positions = self.portfolio.positions
+        positions[equity] = make_position(equity, 2, 95.0)
+        positions[short] = make_position(short, -1, 95.0)
+        positions[future] = make_position(future, 1, 2.0)
+
+        assert_equal(
+            self.portfolio.current_portfolio_weights,
+            pd.Series([0.19, -0.095, 0.2], index=[equity, short, future]),
+        )
+
+        del positions[short]
+        positions[equity] = make_position(equity, 2, 100.0)
+
+        assert_equal(
+            self.portfolio.current_portfolio_weights,
+            pd.Series([0.2, 0.2], index=[equity, future]),
+        )
+
+    def test_many_positions(self):
+        assets = [Equity(sid, exchange='test') for sid in range(100)]
+
+        positions = self.portfolio.positions
+        # The weights are sorted by asset, whatever order the positions were
+        # opened and closed in.
+        for asset in reversed(assets):
+            positions[asset] = make_position(asset, asset.sid, 1.0)
+        self.portfolio.current_portfolio_weights
+        for asset in assets[::2]:
+            del positions[asset]
+
+        held = assets[1::2]
+        assert_equal(
+            self.portfolio.current_portfolio_weights,
+            pd.Series([asset.sid / 1000.0 for asset in held], index=held),
+        )
+
+
+class OrderTestCase(TestCase):
+
+    def test_eq(self):
+        values = {'id': 'a', 'amount': 100, 'filled': 0}
+
+        self.assertEqual(Order(values), Order(values))
+        self.assertNotEqual(Order(values), Order(dict(values, filled=10)))
+        self.assertNotEqual(Order(values), Order(dict(values, stop=None)))
+
+    def test_repr(self):
+        order = Order({'id': 'a', 'amount': 100, 'filled': 0})
+        self.assertEqual(repr(order), "Order(id='a', amount=100, filled=0)")
+
+
+class DeprecatedGetitemTestCase(TestCase):
+
+    def test_getitem(self):
+        portfolio = Portfolio()
+        portfolio.cash = 100.0
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.assertEqual(portfolio['cash'], 100.0)
+
+            with self.assertRaises(KeyError):
+                portfolio['not_an_attribute']
+
+        self.assertEqual(len(w), 1)
+        self.assertIs(w[0].category, DeprecationWarning)
+        self.assertEqual(
+            str(w[0].message),
+            "'portfolio['cash']' is deprecated, please use"
+            " 'portfolio.cash' instead",
+        )
+
+
+class PickleTestCase(TestCase):
+
+    def test_protocol_0(self):
+        # Python 2 needs __getstate__ to pickle slotted objects at protocol 0,
+        # which is what the performance tracker serialization uses there.
+        asset = Equity(1, exchange='test')
+        portfolio = Portfolio()
+        portfolio.cash = 100.0
+        portfolio.positions[asset] = make_position(asset, 10, 2.0)
+        order = Order({'id': 'a', 'amount': 100, 'filled': 0})
+
+        for obj in order, Order(), portfolio, Account():
+            self.assertEqual(
+                repr(pickle.loads(pickle.dumps(obj, protocol=0))),
+                repr(obj),
+            )
+
+        position = pickle.loads(
+            pickle.dumps(portfolio.positions, protocol=0),
+        )[asset]
+        self.assertEqual(position.asset, asset)
+        self.assertEqual(position.amount, 10)
+        self.assertEqual(position.last_sale_price, 2.0)
+
+
+class PositionsTestCase(TestCase):
+
+    def setUp(self):
+        self.assets = [Equity(sid, exchange='test') for sid in range(3)]
+
+    def test_update_position(self):
+        asset = self.assets[0]
+        positions = Positions()
+
+        self.assertNotIn(asset, positions)
+        self.assertEqual(positions[asset].amount, 0)
+
+        positions.update_position(asset, 10, 1.0, 2.0, None)
+        position = positions[asset]
+        self.assertIsInstance(position, Position)
+        self.assertEqual(position.asset, asset)
+        self.assertEqual(position.amount, 10)
+        self.assertEqual(position.cost_basis, 1.0)
+        self.assertEqual(position.last_sale_price, 2.0)
+
+        # Positions already handed out keep the values they had.
+        positions.update_position(asset, 5, 1.0, 3.0, None)
+        self.assertEqual(positions[asset].amount, 5)
+        self.assertEqual(positions[asset].last_sale_price, 3.0)
+        self.assertEqual(position.amount, 10)
+        self.assertEqual(position.last_sale_price, 2.0)
+
+    def test_snapshot_across_get_positions(self):
+        asset = self.assets[0]
+        tracker = PositionTracker('daily')
+        tracker.update_position(asset, amount=10, last_sale_price=1.0)
+
+        snapshot = tracker.get_positions().copy()
+        tracker.update_position(asset, amount=99, last_sale_price=2.0)
+        positions = tracker.get_positions()
+
+        self.assertEqual(snapshot[asset].amount, 10)
+        self.assertEqual(snapshot[asset].last_sale_price, 1.0)
+        self.assertEqual(positions[asset].amount, 99)
+        self.assertEqual(positions[asset].last_sale_price, 2.0)
+
+    def test_delete_by_sid(self):
+        portfolio = Portfolio()
+        portfolio.portfolio_value = 100.0
+        positions = portfolio.positions
+        for amount, asset in enumerate(self.assets, 1):
+            positions.update_position(asset, amount, 0.0, 1.0, None)
+        portfolio.current_portfolio_weights
+
+        # Assets compare equal to their sid.
+        del positions[1]
+        self.assertNotIn(self.assets[1], positions)
+        assert_equal(
+            portfolio.current_portfolio_weights,
+            pd.Series([0.01, 0.03], index=[self.assets[0], self.assets[2]]),
+        )
+
+    def test_weights_follow_stored_positions(self):
+        asset = self.assets[0]
+        portfolio = Portfolio()
+        portfolio.portfolio_value = 100.0
+        positions = portfolio.positions
+
+        position = make_position(asset, 10, 1.0)
+        positions[asset] = position
+        assert_equal(
+            portfolio.current_portfolio_weights,
+            pd.Series([0.1], index=[asset]),
+        )
+
+        # Fractional amounts are kept as they are.
+        position.amount = 20.5
+        assert_equal(
+            portfolio.current_portfolio_weights,
+            pd.Series([0.205], index=[asset]),
+        )
+
+    def test_missing_positions_are_independent(self):
+        positions = Positions()
+        first = positions[self.assets[0]]
+        second = positions[self.assets[1]]
+
+        first.amount = 10
+
+        self.assertEqual(first.amount, 10)
+        self.assertEqual(second.amount, 0)
+        self.assertNotIn(self.assets[0], positions)
+
+    def test_copy_position(self):
+        asset = self.assets[0]
+        positions = Positions()
+        positions.update_position(asset, 10, 1.0, 2.0, None)
+        position = positions[asset]
+
+        for other in copy.copy(position), copy.deepcopy(position):
+            self.assertIsNot(other, position)
+            position.amount += 1
+            self.assertEqual(other.asset, asset)
+            self.assertEqual(other.amount, 10)
+            self.assertEqual(other.cost_basis, 1.0)
+            self.assertEqual(other.last_sale_price, 2.0)
+
+    def test_copies_are_independent(self):
+        asset = self.assets[0]
+        portfolio = Portfolio()
+        portfolio.portfolio_value = 100.0
+        positions = portfolio.positions
+        positions.update_position(asset, 10, 0.0, 1.0, None)
+        portfolio.current_portfolio_weights
+
+        for other in copy.copy(positions), Positions(positions):
+            self.assertIsInstance(other, Positions)
+            self.assertIsNot(other._table, positions._table)
+            self.assertEqual(other[asset].amount, 10)
+
+            other.update_position(self.assets[1], 99, 0.0, 1.0, None)
+            positions.update_position(asset, 7, 0.0, 1.0, None)
+
+            self.assertEqual(other[asset].amount, 10)
+            self.assertEqual(positions[asset].amount, 7)
+            assert_equal(
+                portfolio.current_portfolio_weights,
+                pd.Series([0.07], index=[asset]),
+            )
+
+
+class PositionTableTestCase(TestCase):
+
+    def test_refresh(self):
+        future = Future(3, exchange='test', multiplier=100.0)
+        assets = [Equity(sid, exchange='test') for sid in range(3)] + [future]
+        positions = Positions()
+        for asset in assets:
+            positions[asset] = make_position(asset, asset.sid, 1.0)
+
+        table = PositionTable()
+        table.refresh(positions)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table.multipliers), [1.0, 1.0, 1.0, 100.0])
+
+        # The index is only rebuilt when the held assets change.
+        index = table.assets_index
+        positions.update_position(assets[1], 5, 0.0, 2.0, None)
+        table.refresh(positions)
+        self.assertIs(table.assets_index, index)
+        amounts = dict(zip(table.assets, table.amount))
+        self.assertEqual(amounts[assets[1]], 5)
+
+        del positions[assets[0]]
+        positions[assets[0]] = make_position(assets[0], 1, 1.0)
+        table.refresh(positions)
+        self.assertIs(table.assets_index, index)
+
+        del positions[assets[2]]
+        table.refresh(positions)
+        self.assertEqual(len(table), 3)
+        self.assertNotIn(assets[2], table.assets)
+        assert_equal(table.assets_index, pd.Index(table.assets, dtype=object))
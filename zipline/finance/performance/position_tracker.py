@@ -310,15 +310,15 @@ class PositionTracker(object):
                     pass
                 continue
 
-            position = zp.Position(asset)
-            position.amount = pos.amount
-            position.cost_basis = pos.cost_basis
-            position.last_sale_price = pos.last_sale_price
-            position.last_sale_date = pos.last_sale_date
-
             # Adds the new position if we didn't have one before, or overwrite
-            # one we have currently
-            positions[asset] = position
+            # the values of the one we have currently
+            positions.update_position(
+                asset,
+                pos.amount,
+                pos.cost_basis,
+                pos.last_sale_price,
+                pos.last_sale_date,
+            )
 
         return positions
 
@@ -14,11 +14,14 @@
 # limitations under the License.
 from warnings import warn
 
+import numpy as np
 import pandas as pd
+from six import iteritems
 
 from zipline.assets import Asset, Future
 from zipline.utils.input_validation import expect_types
 from .utils.enum import enum
+from .utils.sentinel import sentinel
 from zipline._protocol import BarData  # noqa
 
 
@@ -41,7 +44,7 @@ DATASOURCE_TYPE = enum(
 )
 
 # Expected fields/index values for a dividend Series.
-DIVIDEND_FIELDS = [
+DIVIDEND_FIELDS = (
     'declared_date',
     'ex_date',
     'gross_amount',
@@ -50,14 +53,14 @@ DIVIDEND_FIELDS = [
     'payment_sid',
     'ratio',
     'sid',
-]
+)
 # Expected fields/index values for a dividend payment Series.
-DIVIDEND_PAYMENT_FIELDS = [
+DIVIDEND_PAYMENT_FIELDS = (
     'id',
     'payment_sid',
     'cash_amount',
     'share_count',
-]
+)
 
 
 class Event(object):
@@ -98,24 +101,105 @@ def _deprecated_getitem_method(name, attrs):
     __getitem__ : callable[any, str]
         The ``__getitem__`` method to put in the class dict.
     """
-    attrs = frozenset(attrs)
     msg = (
         "'{name}[{attr!r}]' is deprecated, please use"
         " '{name}.{attr}' instead"
     )
+    # Format the warning for each allowed attribute up front; the lookup
+    # doubles as the membership test.
+    messages = {attr: msg.format(name=name, attr=attr) for attr in attrs}
 
     def __getitem__(self, key):
         """``__getitem__`` is deprecated, please use attribute access instead.
         """
-        warn(msg.format(name=name, attr=key), DeprecationWarning, stacklevel=2)
-        if key in attrs:
-            return self.__dict__[key]
-        raise KeyError(key)
+        message = messages.get(key)
+        if message is None:
+            raise KeyError(key)
+        warn(message, DeprecationWarning, stacklevel=2)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
 
     return __getitem__
 
 
-class Order(Event):
+def _slots_getstate(self):
+    """``__getstate__`` for the classes below that use ``__slots__``.
+
+    Python 2 cannot pickle an object with ``__slots__`` at protocols 0 and 1
+    unless its class defines ``__getstate__``.
+    """
+    return {
+        name: getattr(self, name)
+        for name in self.__slots__
+        if hasattr(self, name)
+    }
+
+
+def _slots_setstate(self, state):
+    for name, value in iteritems(state):
+        setattr(self, name, value)
+
+
+_Unset = sentinel('_Unset', 'Placeholder for an Order field with no value.')
+
+
+class Order(object):
+    """The algorithm facing view of a :class:`zipline.finance.order.Order`.
+    """
+    # using __slots__ to save on memory usage. An algorithm can hold many
+    # Order objects at once. These are the keys of
+    # ``zipline.finance.order.Order.to_dict``.
+    __slots__ = (
+        'id',
+        'dt',
+        'reason',
+        'created',
+        'sid',
+        'amount',
+        'filled',
+        'commission',
+        'stop',
+        'limit',
+        'stop_reached',
+        'limit_reached',
+        'broker_order_id',
+        'status',
+    )
+
+    def __init__(self, initial_values=None):
+        if initial_values:
+            for name, value in iteritems(initial_values):
+                setattr(self, name, value)
+
+    def keys(self):
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def _values(self):
+        return tuple(getattr(self, name, _Unset) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __contains__(self, name):
+        return name in self.__slots__ and hasattr(self, name)
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def __repr__(self):
+        return "Order({0})".format(", ".join(
+            "{0}={1!r}".format(name, getattr(self, name))
+            for name in self.keys()
+        ))
+
+    def to_series(self, index=None):
+        return pd.Series(self._asdict(), index=index)
+
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
+
     # If you are adding new attributes, don't update this set. This method
     # is deprecated to normal attribute access so we don't want to encourage
     # new usages.
@@ -137,10 +221,25 @@ class Order(Event):
 
 
 def asset_multiplier(asset):
-    return asset.multiplier if isinstance(asset, Future) else 1
+    # Future is never subclassed, so an exact type check is enough here and
+    # is cheaper than isinstance. A subclass of Future would need to be added
+    # to this check to get its multiplier applied.
+    return asset.multiplier if type(asset) is Future else 1
 
 
 class Portfolio(object):
+    __slots__ = (
+        'capital_used',
+        'starting_cash',
+        'portfolio_value',
+        'pnl',
+        'returns',
+        'cash',
+        'positions',
+        'start_date',
+        'positions_value',
+        'positions_exposure',
+    )
 
     def __init__(self):
         self.capital_used = 0.0
@@ -152,9 +251,15 @@ class Portfolio(object):
         self.positions = Positions()
         self.start_date = None
         self.positions_value = 0.0
+        self.positions_exposure = 0.0
 
     def __repr__(self):
-        return "Portfolio({0})".format(self.__dict__)
+        return "Portfolio({0})".format({
+            name: getattr(self, name) for name in self.__slots__
+        })
+
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
 
     # If you are adding new attributes, don't update this set. This method
     # is deprecated to normal attribute access so we don't want to encourage
@@ -183,15 +288,19 @@ class Portfolio(object):
         futures contract's value is its unit price times number of shares held
         times the multiplier.
         """
-        position_values = pd.Series({
-            asset: (
-                position.last_sale_price *
-                position.amount *
-                asset_multiplier(asset)
-            )
-            for asset, position in self.positions.items()
-        })
-        return position_values / self.portfolio_value
+        positions = self.positions
+        table = positions._table
+        table.refresh(positions)
+        # Allocate a single output array and do the rest of the arithmetic in
+        # place on it.
+        weights = np.multiply(table.amount, table.last_sale_price)
+        weights *= table.multipliers
+        # Scale by the reciprocal rather than dividing each element. A zero
+        # portfolio value still produces inf/nan weights, silently, as the
+        # pandas division used to.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights *= 1.0 / np.float64(self.portfolio_value)
+        return pd.Series(weights, index=table.assets_index, copy=False)
 
 
 class Account(object):
@@ -201,6 +310,25 @@ class Account(object):
     If connected to a broker, one can update these values with the trading
     account values as reported by the broker.
     '''
+    __slots__ = (
+        'settled_cash',
+        'accrued_interest',
+        'buying_power',
+        'equity_with_loan',
+        'total_positions_value',
+        'total_positions_exposure',
+        'regt_equity',
+        'regt_margin',
+        'initial_margin_requirement',
+        'maintenance_margin_requirement',
+        'available_funds',
+        'excess_liquidity',
+        'cushion',
+        'day_trades_remaining',
+        'leverage',
+        'net_leverage',
+        'net_liquidation',
+    )
 
     def __init__(self):
         self.settled_cash = 0.0
@@ -222,7 +350,12 @@ class Account(object):
         self.net_liquidation = 0.0
 
     def __repr__(self):
-        return "Account({0})".format(self.__dict__)
+        return "Account({0})".format({
+            name: getattr(self, name) for name in self.__slots__
+        })
+
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
 
     # If you are adding new attributes, don't update this set. This method
     # is deprecated to normal attribute access so we don't want to encourage
@@ -250,7 +383,81 @@ class Account(object):
     )
 
 
+class PositionTable(object):
+    """Column oriented copy of the positions in a :class:`Positions`, used
+    for portfolio level computations.
+
+    The rows are sorted by asset. The rows and the multiplier of each row's
+    asset are only rebuilt when the set of held assets changes. The amount and
+    price columns are copied out of the :class:`Position` objects on every
+    :meth:`refresh`, so they never go stale.
+    """
+
+    def __init__(self):
+        # The held assets, in row order.
+        self.assets = []
+        self.assets_index = pd.Index(self.assets, dtype=object)
+        self.multipliers = np.ones(0)
+        self.amount = np.zeros(0)
+        self.last_sale_price = np.zeros(0)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def refresh(self, positions):
+        """Copy the amount and last sale price of each position in
+        ``positions`` into the columns.
+
+        Parameters
+        ----------
+        positions : Positions
+            The positions to read.
+        """
+        # ``get`` does not fall back to ``__missing__``, so a held asset
+        # that has been removed shows up as None.
+        get = positions.get
+        held = [get(asset) for asset in self.assets]
+        if len(held) != len(positions) or None in held:
+            self._rebuild(positions)
+            held = [get(asset) for asset in self.assets]
+
+        n = len(held)
+        self.amount = np.fromiter(
+            (position.amount for position in held),
+            dtype='float64',
+            count=n,
+        )
+        self.last_sale_price = np.fromiter(
+            (position.last_sale_price for position in held),
+            dtype='float64',
+            count=n,
+        )
+
+    def _rebuild(self, positions):
+        # Sort the rows by asset, the order the weights had when they were
+        # built from a dict, falling back to the mapping's order the way
+        # pandas does.
+        try:
+            self.assets = sorted(positions)
+        except TypeError:
+            self.assets = list(positions)
+        self.assets_index = pd.Index(self.assets, dtype=object)
+        self.multipliers = np.fromiter(
+            (asset_multiplier(asset) for asset in self.assets),
+            dtype='float64',
+            count=len(self.assets),
+        )
+
+
 class Position(object):
+    __slots__ = (
+        'asset',
+        'amount',
+        'cost_basis',
+        'last_sale_price',
+        'last_sale_date',
+    )
+
     @expect_types(asset=Asset)
     def __init__(self, asset):
         self.asset = asset
@@ -265,7 +472,12 @@ class Position(object):
         return self.asset
 
     def __repr__(self):
-        return "Position({0})".format(self.__dict__)
+        return "Position({0})".format({
+            name: getattr(self, name) for name in self.__slots__
+        })
+
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
 
     # If you are adding new attributes, don't update this set. This method
     # is deprecated to normal attribute access so we don't want to encourage
@@ -285,6 +497,14 @@ class Position(object):
 # does something like `context.portfolio.positions[100]` instead of
 # `context.portfolio.positions[sid(100)]`.
 class _DeprecatedSidLookupPosition(object):
+    __slots__ = (
+        'sid',
+        'amount',
+        'cost_basis',
+        'last_sale_price',
+        'last_sale_date',
+    )
+
     def __init__(self, sid):
         self.sid = sid
         self.amount = 0
@@ -293,7 +513,12 @@ class _DeprecatedSidLookupPosition(object):
         self.last_sale_date = None
 
     def __repr__(self):
-        return "_DeprecatedSidLookupPosition({0})".format(self.__dict__)
+        return "_DeprecatedSidLookupPosition({0})".format({
+            name: getattr(self, name) for name in self.__slots__
+        })
+
+    __getstate__ = _slots_getstate
+    __setstate__ = _slots_setstate
 
     # If you are adding new attributes, don't update this set. This method
     # is deprecated to normal attribute access so we don't want to encourage
@@ -310,6 +535,39 @@ class _DeprecatedSidLookupPosition(object):
 
 
 class Positions(dict):
+    """A dict-like object containing the algorithm's current positions.
+
+    :attr:`Portfolio.current_portfolio_weights` reads the positions through
+    a :class:`PositionTable` that is refreshed each time the weights are
+    computed.
+    """
+    def __init__(self, *args, **kwargs):
+        super(Positions, self).__init__(*args, **kwargs)
+        self._table = PositionTable()
+
+    def update_position(self,
+                        asset,
+                        amount,
+                        cost_basis,
+                        last_sale_price,
+                        last_sale_date):
+        """Store a new :class:`Position` in ``asset`` holding the given
+        values. Positions handed out earlier keep the values they had.
+        """
+        # Skip the input validation in Position.__init__; this is called for
+        # every held asset on every bar.
+        position = Position.__new__(Position)
+        position.asset = asset
+        position.amount = amount
+        position.cost_basis = cost_basis
+        position.last_sale_price = last_sale_price
+        position.last_sale_date = last_sale_date
+        self[asset] = position
+
+    def __reduce__(self):
+        # Rebuild through __init__ so that copies get their own table.
+        return type(self), (), None, None, iteritems(self)
+
     def __missing__(self, key):
         if isinstance(key, Asset):
             return Position(key)